@@ -1,5 +1,6 @@
 from __future__ import annotations
 
 from .acbfxml import ACBF
+from .acbfxml import metadata_from_bytes
 
-__all__ = ['ACBF']
+__all__ = ['ACBF', 'metadata_from_bytes']
@@ -14,9 +14,9 @@
 # limitations under the License.
 from __future__ import annotations
 
+import itertools
 import logging
 import re
-import xml.etree.ElementTree as ET
 from typing import Any
 from typing import TYPE_CHECKING
 
@@ -27,16 +27,100 @@ from comicapi.genericmetadata import PageMetadata
 from comicapi.tags import Tag
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
     from comicapi.archivers import Archiver
 
+try:
+    from lxml import etree as ET
+
+    _LXML = True
+    _PARSER_OPTIONS: dict[str, Any] = {
+        'remove_blank_text': True, 'remove_comments': True, 'remove_pis': True, 'huge_tree': True,
+        # Entities declared in the document are resolved as the stdlib does, external ones never are. Before lxml 5
+        # any true value resolves external entities too
+        'resolve_entities': 'internal' if ET.LXML_VERSION >= (5,) else False, 'no_network': True,
+    }
+    # remove_blank_text drops the file's own formatting so lxml has to indent again when serializing
+    _TOSTRING_OPTIONS: dict[str, Any] = {'pretty_print': True}
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+    _LXML = False
+    _PARSER_OPTIONS = {}
+    _TOSTRING_OPTIONS = {}
+
 logger = logging.getLogger(f'comicapi.metadata.{__name__}')
 
+_YEAR_RE = re.compile(r'\d{4}')
+
+# The metadata is never read from embedded images (binary), which can be most of an ACBF file
+_UNREAD_TAG = 'binary'
+
+# Genre names that don't match an ACBF genre but have an equivalent
+# TODO More replacements?
+_GENRE_REMAP = {'historical': 'history'}
+
+
+def _parser() -> Any:
+    """A parser with the parser options for fromstring. None for the stdlib, which takes no options."""
+    return ET.XMLParser(**_PARSER_OPTIONS) if _LXML else None
+
+
+def _pull_parser(events: tuple[str, ...], tags: tuple[str, ...] = ()) -> Any:
+    """A pull parser reporting the events, only for the tags with lxml. The stdlib reports every element."""
+    if not _LXML:
+        return ET.XMLPullParser(events=events)
+    return ET.XMLPullParser(events=events, tag=tags or None, **_PARSER_OPTIONS)
+
+
+def _feed(parser: Any, string: bytes, size: int) -> Iterator[tuple[str, Any]]:
+    # Feed the string in chunks of size, reporting the events of each chunk before parsing the next
+    for offset in range(0, len(string), size):
+        parser.feed(string[offset:offset + size])
+        yield from parser.read_events()
+
+
+def _build_role_map() -> dict[str, tuple[str, bool]]:
+    # Maps a casefolded credit role to the ACBF activity and whether the credit language is kept.
+    # Order matters, the first group a role appears in wins (e.g. 'artist' is also a penciller synonym)
+    groups: list[tuple[tuple[str, ...] | list[str], str, bool]] = [
+        (GenericMetadata.writer_synonyms, 'Writer', True),
+        (['adapter'], 'Adapter', True),
+        (['artist'], 'Artist', False),
+        (GenericMetadata.penciller_synonyms, 'Penciller', False),
+        (GenericMetadata.inker_synonyms, 'Inker', False),
+        (GenericMetadata.colorist_synonyms, 'Colorist', False),
+        (['photographer', 'photo'], 'Photographer', False),
+        (GenericMetadata.letterer_synonyms, 'Letterer', True),
+        (GenericMetadata.cover_synonyms, 'CoverArtist', False),
+        (GenericMetadata.editor_synonyms, 'Editor', True),
+        (['assistant editor'], 'Assistant Editor', True),
+        (GenericMetadata.translator_synonyms, 'Translator', True),
+        (['other'], 'Other', True),
+    ]
+    role_map: dict[str, tuple[str, bool]] = {}
+    for synonyms, activity, include_lang in groups:
+        for role in synonyms:
+            role_map.setdefault(role.casefold(), (activity, include_lang))
+    return role_map
+
 
 class ACBF(Tag):
     enabled = True
 
     id = 'acbf'
 
+    _ROLE_MAP: dict[str, tuple[str, bool]] = _build_role_map()
+
+    _ALLOWED_GENRES = frozenset({
+        'other', 'adult', 'adventure', 'alternative', 'artbook', 'biography', 'caricature', 'children',
+        'computer', 'crime', 'education', 'fantasy', 'history', 'horror', 'humor', 'manga', 'military',
+        'mystery', 'non-fiction', 'politics', 'real_life', 'religion', 'romance', 'science_fiction',
+        'sports', 'superhero', 'western',
+    })
+
     def __init__(self, version: str) -> None:
         super().__init__(version)
         # Record the acbf versions we support
@@ -86,69 +170,90 @@ class ACBF(Tag):
         return archive.supports_files()
 
     def has_tags(self, archive: Archiver) -> bool:
-        # Check for .acbf files
-        self.file = None
-        for file in archive.get_filename_list():
-            if file.endswith('.acbf'):
-                self.file = file
-                break
-
-        return (
-            self.file is not None and self.supports_tags(archive) and self._validate_bytes(archive.read_file(self.file))
-        )
+        metadata = self._read_acbf(archive)
+        return metadata is not None and self._validate_bytes(metadata)
 
     def remove_tags(self, archive: Archiver) -> bool:
         return self.has_tags(archive) and archive.remove_file(self.file)
 
     def read_tags(self, archive: Archiver) -> GenericMetadata:
-        if self.has_tags(archive):
-            metadata = archive.read_file(self.file) or b''
-            if self._validate_bytes(metadata):
-                return self._metadata_from_bytes(metadata, utils.get_page_name_list(archive.get_filename_list()))
+        metadata = self._read_acbf(archive)
+        if metadata:
+            # Validated while parsing rather than with a separate pass
+            root = self._parse_acbf(metadata, drop_unread=True)
+            if root is not None:
+                return self._convert_xml_to_metadata(root, utils.get_page_name_list(archive.get_filename_list()))
         return GenericMetadata()
 
     def read_raw_tags(self, archive: Archiver) -> str:
-        if self.has_tags(archive):
-            return ET.tostring(ET.fromstring(archive.read_file(self.file)), encoding='unicode', xml_declaration=True)
+        metadata = self._read_acbf(archive)
+        if metadata:
+            root = self._parse_acbf(metadata)
+            if root is not None:
+                # lxml will not write an XML declaration to a str, so encode and decode
+                return ET.tostring(root, encoding='utf-8', xml_declaration=True, **_TOSTRING_OPTIONS).decode('utf-8')
         return ''
 
     def write_tags(self, metadata: GenericMetadata, archive: Archiver) -> bool:
         if self.supports_tags(archive):
-            xml = b''
-            if self.has_tags(archive):
-                xml = archive.read_file(self.file)
+            root = None
+            xml = self._read_acbf(archive)
+            if xml:
+                # Validated while parsing, a current file that isn't ACBF is replaced
+                root = self._parse_acbf(xml)
+                if root is None and self._validate_bytes(xml):
+                    # Don't lose what can't be read back
+                    logger.error(
+                        'Archive (%s) has an ACBF file that could not be parsed, not replacing it', archive.name(),
+                    )
+                    return False
             if self.file is None:
                 self.file = 'comic_metadata.acbf'
-            return archive.write_file(self.file, self._bytes_from_metadata(metadata, xml))
+            return archive.write_file(self.file, self._bytes_from_xml(self._convert_metadata_to_xml(metadata, root)))
         logger.warning('Archive (%s) does not support %s metadata', archive.name(), self.name())
         return False
 
     def name(self) -> str:
         return 'ACBF'
 
+    def _read_acbf(self, archive: Archiver) -> bytes | None:
+        # Returns the bytes of the archive's .acbf file, if any. The archive is searched once per public call and
+        # the file found is left in self.file for the rest of that call
+        self.file = self._locate_acbf(archive)
+
+        if self.file is None or not self.supports_tags(archive):
+            return None
+
+        return archive.read_file(self.file)
+
+    def _locate_acbf(self, archive: Archiver) -> str | None:
+        # Only the first .acbf file is used
+        for file in archive.get_filename_list():
+            if file.endswith('.acbf'):
+                return file
+        return None
+
     @classmethod
     def _get_parseable_credits(cls) -> list[str]:
-        parsable_credits: list[str] = []
-        parsable_credits.extend(GenericMetadata.writer_synonyms)
-        parsable_credits.extend(GenericMetadata.penciller_synonyms)
-        parsable_credits.extend(GenericMetadata.inker_synonyms)
-        parsable_credits.extend(GenericMetadata.colorist_synonyms)
-        parsable_credits.extend(GenericMetadata.letterer_synonyms)
-        parsable_credits.extend(GenericMetadata.cover_synonyms)
-        parsable_credits.extend(GenericMetadata.editor_synonyms)
-        parsable_credits.extend(GenericMetadata.translator_synonyms)
-        parsable_credits.append('adapter')
-        parsable_credits.append('photographer')
-        parsable_credits.append('assistant editor')
-        parsable_credits.append('other')
-        return parsable_credits
+        return list(cls._ROLE_MAP)
 
     def _metadata_from_bytes(self, string: bytes, file_list: list[str]) -> GenericMetadata:
-        root = ET.fromstring(string)
+        root = ET.fromstring(string, _parser())
         return self._convert_xml_to_metadata(root, file_list)
 
     def _bytes_from_metadata(self, metadata: GenericMetadata, xml: bytes = b'') -> bytes:
-        root = self._convert_metadata_to_xml(metadata, xml)
+        root = ET.fromstring(xml, _parser()) if xml else None
+        return self._bytes_from_xml(self._convert_metadata_to_xml(metadata, root))
+
+    def _bytes_from_xml(self, root: ET.Element) -> bytes:
+        if _LXML:
+            # lxml indents while serializing
+            return ET.tostring(root, encoding='utf-8', xml_declaration=True, **_TOSTRING_OPTIONS)
+
+        # ET.indent is Python 3.9+
+        indent = getattr(ET, 'indent', None)
+        if indent is not None:
+            indent(root)
         return ET.tostring(root, encoding='utf-8', xml_declaration=True)
 
     def _remove_acbf_xml_namespaces(self, root: ET.Element) -> None:
@@ -156,152 +261,146 @@ class ACBF(Tag):
         # This can cause issues if someone decides to actually use namespaces when writing an acbf file.
         # This shouldn't matter as the official ACBF editor does the same thing
         for ele in root.iter():
-            if ele.tag.startswith('{'):
-                ele.tag = ele.tag.split('}')[1]
-
-    def _convert_metadata_to_xml(self, metadata: GenericMetadata, xml: bytes = b'') -> ET.Element:
-        def add_element(element: ET.Element, sub_element: str, text: str = '', attribs: dict[str, str] | None = None) -> None:
-            if not isinstance(element, ET.Element):
-                raise Exception('add_element: Not an ET.Element: %s', element)
-
-            attribs = attribs or {}
-
-            new_element = ET.SubElement(element, sub_element)
-
-            if text:
-                new_element.text = str(text)
-
-            for k, v in attribs.items():
-                new_element.attrib[k] = v
-
-        def add_path(path: str) -> ET.Element:
-            path_list: list[str] = path.split('/')
-            test_path: str = ''
-
-            for i, p in enumerate(path_list):
-                test_path = '/'.join(path_list[:i + 1])
-
-                if root.find(test_path) is None:
-                    if i == 0:
-                        add_element(root, p)
-                    else:
-                        *element_path_parts, element_name = test_path.split('/')
-                        element_path = '/'.join(element_path_parts)
-                        add_root = root.find(element_path)
-                        if add_root is None:
-                            raise Exception('add_path: Failed to find XML path element: %s', add_root)
-                        else:
-                            add_element(add_root, p)
-
-            ele = root.find(path)
-            if ele is None:
-                raise Exception('add_path: Failed to create XML path element: %s', path)
-            else:
-                return ele
-
-        def get_or_create_element(tag: str) -> ET.Element:
-            element = root.find(tag)
-            if element is None:
-                element = add_path(tag)
-            return element
-
-        def remove_attribs(ele: ET.Element) -> ET.Element:
-            ele.attrib.clear()
-            return ele
-
-        def modify_element(path: str, value: Any, attribs: dict[str, str] | None = None, clear_attribs: bool = False) -> None:
-            attribs = attribs or {}
-
-            # Split the path into parent and element name
-            *element_path_parts, element_name = path.split('/')
-            element_path = '/'.join(element_path_parts)
-
-            element_parent = get_or_create_element(element_path)
-
-            element = root.find(path)
-            if element is None:
-                try:
-                    element = ET.SubElement(element_parent, element_name)
-                except Exception as e:
-                    logger.warning(f'Failed to modify XML element: {element_path}, {element_name}. Error: {e}')
-                    return
-
-            if clear_attribs:
-                element = remove_attribs(element)
-
-            element.text = str(value)
-            for k, v in attribs.items():
-                element.attrib[k] = v
-
-        def clear_element(full_ele: str) -> None:
-            element_path, _, element_name = full_ele.rpartition('/')
-            element_parent = root.find(element_path)
-            if element_parent is not None:
-                for e in element_parent.findall(element_name):
-                    element_parent.remove(e)
-
-        def add_page(md_page: PageMetadata, xml_page: ET.Element | None = None, is_cover: bool = False) -> None:
-            if xml_page is not None:
-                if md_page.bookmark:
-                    for t in xml_page.findall('title'):
-                        # Empty lang is presumed 'en', remove any to add new bookmark/title
-                        if t.get('lang', '') in ['en', '']:
-                            xml_page.remove(t)
-            else:
-                xml_page = ET.Element('page')
-                add_element(xml_page, 'image', '', {'href': page.filename})
+            if isinstance(ele.tag, str) and ele.tag[:1] == '{':
+                ele.tag = ele.tag.partition('}')[2]
+
+        # lxml keeps the now unused namespace declarations around
+        cleanup_namespaces = getattr(ET, 'cleanup_namespaces', None)
+        if cleanup_namespaces is not None:
+            cleanup_namespaces(root)
+
+    def _xml_add_element(
+        self, element: ET.Element, sub_element: str, text: str = '', attribs: dict[str, str] | None = None,
+    ) -> None:
+        if not ET.iselement(element):
+            raise Exception('add_element: Not an ET.Element: %s', element)
+
+        new_element = ET.SubElement(element, sub_element, attribs or {})
+
+        if text:
+            new_element.text = str(text)
+
+    def _xml_add_path(self, root: ET.Element, path: str) -> ET.Element:
+        # Walk the path one element at a time, creating any that are missing
+        element = root
+        for p in path.split('/'):
+            child = element.find(p)
+            if child is None:
+                child = ET.SubElement(element, p)
+            element = child
+        return element
+
+    def _xml_modify_element(
+        self, root: ET.Element, path: str, value: Any, attribs: dict[str, str] | None = None,
+        clear_attribs: bool = False,
+    ) -> None:
+        attribs = attribs or {}
+
+        # Split the path into parent and element name
+        element_path, _, element_name = path.rpartition('/')
+
+        element_parent = self._xml_add_path(root, element_path)
+
+        element = element_parent.find(element_name)
+        if element is None:
+            try:
+                element = ET.SubElement(element_parent, element_name)
+            except Exception as e:
+                logger.warning(f'Failed to modify XML element: {element_path}, {element_name}. Error: {e}')
+                return
 
+        if clear_attribs:
+            element.attrib.clear()
+
+        element.text = str(value)
+        for k, v in attribs.items():
+            element.attrib[k] = v
+
+    def _xml_clear_element(self, root: ET.Element, full_ele: str) -> None:
+        element_path, _, element_name = full_ele.rpartition('/')
+        element_parent = root.find(element_path)
+        if element_parent is not None:
+            for e in element_parent.findall(element_name):
+                element_parent.remove(e)
+
+    def _xml_set_names(self, root: ET.Element, path: str, names: Iterable[str]) -> None:
+        # Replace the contents of a list of <name> elements e.g. characters
+        container = self._xml_add_path(root, path)
+        container.clear()
+        for name in names:
+            ET.SubElement(container, 'name').text = name
+
+    def _xml_remove_indexed_child(
+        self, parent: ET.Element, index: dict[str, list[ET.Element]], ele: ET.Element,
+    ) -> None:
+        parent.remove(ele)
+        index[ele.tag].remove(ele)
+
+    def _xml_add_page(
+        self, book_info: ET.Element, body_node: ET.Element, md_page: PageMetadata, xml_page: ET.Element | None = None,
+        is_cover: bool = False, lang: str | None = None,
+    ) -> None:
+        # Cover page lives in book-info, not body
+        parent = book_info if is_cover else body_node
+        if xml_page is not None:
             if md_page.bookmark:
-                if md.language:
-                    add_element(xml_page, 'title', md_page.bookmark, {'lang': md.language})
-                else:
-                    add_element(xml_page, 'title', md_page.bookmark)
+                for t in xml_page.findall('title'):
+                    # Empty lang is presumed 'en', remove any to add new bookmark/title
+                    if t.get('lang', '') in ['en', '']:
+                        xml_page.remove(t)
+            xml_page.tag = 'coverpage' if is_cover else 'page'
+            parent.append(xml_page)
+        else:
+            # Create new pages in place rather than building them detached and appending
+            xml_page = ET.SubElement(parent, 'coverpage' if is_cover else 'page')
+            ET.SubElement(xml_page, 'image', {'href': md_page.filename})
 
-            if is_cover:
-                xml_page.tag = 'coverpage'
-                book_info.append(xml_page)
+        if md_page.bookmark:
+            if lang:
+                self._xml_add_element(xml_page, 'title', md_page.bookmark, {'lang': lang})
             else:
-                body_node.append(xml_page)
-
-        def add_credit(person: str, role: str, lang: str | None = None) -> None:
-            # There is no way to know first from last from Credit.person so assume first last by spaces
-            first: str | None = None
-            middle: str | None = None
-            last: str | None = None
-            nick: str | None = None
-
-            name_split = person.split()
-            if len(name_split) == 1:
-                nick = name_split[0]
-            elif len(name_split) == 2:
-                first = name_split[0]
-                last = name_split[1]
-            elif len(name_split) > 2:
-                first = name_split[0]
-                middle = name_split[1]
-                last = name_split[2]
-
-            if not (first or last or nick):
-                return
-
-            element = ET.SubElement(book_info, 'author', activity=role)
-            if lang is not None:
-                element.attrib['lang'] = lang
-            if first is not None:
-                add_element(element, 'first-name', first)
-            if middle is not None:
-                add_element(element, 'middle-name', middle)
-            if last is not None:
-                add_element(element, 'last-name', last)
-            if nick is not None:
-                add_element(element, 'nickname', nick)
-
-        # xml is empty bytes or has the read acbf xml
+                self._xml_add_element(xml_page, 'title', md_page.bookmark)
+
+    def _xml_add_credit(self, book_info: ET.Element, person: str, role: str, lang: str | None = None) -> None:
+        # There is no way to know first from last from Credit.person so assume first last by spaces
+        first: str | None = None
+        middle: str | None = None
+        last: str | None = None
+        nick: str | None = None
+
+        name_split = person.split()
+        if len(name_split) == 1:
+            nick = name_split[0]
+        elif len(name_split) == 2:
+            first = name_split[0]
+            last = name_split[1]
+        elif len(name_split) > 2:
+            first = name_split[0]
+            middle = name_split[1]
+            last = name_split[2]
+
+        if not (first or last or nick):
+            return
+
+        attribs = {'activity': role}
+        if lang is not None:
+            attribs['lang'] = lang
+        element = ET.SubElement(book_info, 'author', attribs)
+        if first is not None:
+            self._xml_add_element(element, 'first-name', first)
+        if middle is not None:
+            self._xml_add_element(element, 'middle-name', middle)
+        if last is not None:
+            self._xml_add_element(element, 'last-name', last)
+        if nick is not None:
+            self._xml_add_element(element, 'nickname', nick)
+
+    def _convert_metadata_to_xml(self, metadata: GenericMetadata, root: ET.Element | None = None) -> ET.Element:
+        # root is None or the parsed acbf xml, which is modified in place
         # shorthand for the metadata
         md = metadata
         ns_url = 'http://www.acbf.info/xml/acbf/1.2'
-        if xml:
-            root: ET.Element = ET.fromstring(xml)
+        if root is not None:
             self._remove_acbf_xml_namespaces(root)
             root.attrib['xmlns'] = ns_url
         else:
@@ -309,57 +408,27 @@ class ACBF(Tag):
             root = ET.Element('ACBF')
             root.attrib['xmlns'] = ns_url
 
-        book_info = get_or_create_element('meta-data/book-info')
+        book_info = self._xml_add_path(root, 'meta-data/book-info')
+        # Index the current book-info children by tag so each field doesn't rescan them all.
+        # Only elements read from the XML are indexed, newly added elements are never looked up again.
+        book_info_index: dict[str, list[ET.Element]] = {}
+        for child in book_info:
+            book_info_index.setdefault(child.tag, []).append(child)
 
         # Comic authors
         # 'Writer', 'Adapter', 'Artist', 'Penciller', 'Inker', 'Colorist', 'Letterer', 'CoverArtist', 'Photographer',
         # 'Editor', 'Assistant Editor', 'Translator', 'Other'
         # Wipe all authors as any from the XML should be in md
         # TODO Need to dedupe?
-        clear_element('meta-data/book-info/author')
+        for author in book_info_index.pop('author', []):
+            book_info.remove(author)
 
         for credit in md.credits:
-            if credit.role.casefold() in GenericMetadata.writer_synonyms:
-                add_credit(credit.person, 'Writer', credit.language)
-
-            elif credit.role.casefold() in ['adapter']:
-                add_credit(credit.person, 'Adapter', credit.language)
-
-            elif credit.role.casefold() in ['artist']:
-                add_credit(credit.person, 'Artist')
-
-            elif credit.role.casefold() in GenericMetadata.penciller_synonyms:
-                add_credit(credit.person, 'Penciller')
-
-            elif credit.role.casefold() in GenericMetadata.inker_synonyms:
-                add_credit(credit.person, 'Inker')
-
-            elif credit.role.casefold() in GenericMetadata.colorist_synonyms:
-                add_credit(credit.person, 'Colorist')
-
-            elif credit.role.casefold() in ['photographer', 'photo']:
-                add_credit(credit.person, 'Photographer')
-
-            elif credit.role.casefold() in GenericMetadata.letterer_synonyms:
-                add_credit(credit.person, 'Letterer', credit.language)
-
-            elif credit.role.casefold() in GenericMetadata.cover_synonyms:
-                add_credit(credit.person, 'CoverArtist')
-
-            elif credit.role.casefold() in GenericMetadata.editor_synonyms:
-                add_credit(credit.person, 'Editor', credit.language)
-
-            elif credit.role.casefold() in ['assistant editor']:
-                add_credit(credit.person, 'Assistant Editor', credit.language)
-
-            elif credit.role.casefold() in GenericMetadata.translator_synonyms:
-                add_credit(credit.person, 'Translator', credit.language)
-
-            else:
-                add_credit(credit.person, 'Other', credit.language)
+            activity, include_lang = self._ROLE_MAP.get(credit.role.casefold(), ('Other', True))
+            self._xml_add_credit(book_info, credit.person, activity, credit.language if include_lang else None)
 
         if md.series:
-            sequence = root.findall('meta-data/book-info/sequence')
+            sequence = list(book_info_index.get('sequence', []))
             # If there is only one sequence field, replace it. Otherwise, keep all but dupe issue number
             if len(sequence) == 1:
                 sequence.clear()
@@ -367,7 +436,7 @@ class ACBF(Tag):
                 for seq in sequence:
                     # Will presume if the number is the same as md, can be removed and re-added with updated data
                     if seq.text == md.issue:
-                        book_info.remove(seq)
+                        self._xml_remove_indexed_child(book_info, book_info_index, seq)
 
             element = ET.SubElement(book_info, 'sequence')
             element.attrib['title'] = md.series
@@ -377,7 +446,7 @@ class ACBF(Tag):
                 element.attrib['volume'] = str(md.volume)
 
         if md.title:
-            cur_titles: list[ET.Element] = root.findall('meta-data/book-info/book-title')
+            cur_titles: list[ET.Element] = book_info_index.get('book-title', [])
             found = False
             # Clear any 'en' or no language field to be replaced with new
             for title in cur_titles:
@@ -389,38 +458,32 @@ class ACBF(Tag):
             if md.language:
                 element.attrib['lang'] = md.language
 
-        allow_genres = [
-            'other', 'adult', 'adventure', 'alternative', 'artbook', 'biography', 'caricature', 'children',
-            'computer', 'crime', 'education', 'fantasy', 'history', 'horror', 'humor', 'manga', 'military',
-            'mystery', 'non-fiction', 'politics', 'real_life', 'religion', 'romance', 'science_fiction',
-            'sports', 'superhero', 'western',
-        ]
         # Store current genres for 'match' values
-        cur_genres: list[ET.Element] = root.findall('meta-data/book-info/genre')
-        clear_element('meta-data/book-info/genre')
+        cur_genres: list[ET.Element] = book_info_index.pop('genre', [])
+        for cg in cur_genres:
+            book_info.remove(cg)
         if md.manga is not None and md.manga.casefold().startswith('yes'):
             md.genres.add('manga')
-        for g in md.genres:
-            g = g.casefold().replace(' ', '_')
-            # TODO More replacements?
-            if g == 'historical':
-                g = 'history'
-
-            if g in allow_genres:
-                # Check for current to keep any match value
-                match: int = 0
-                for cg in cur_genres:
-                    if cg.text == g:
-                        if cg.get('match'):
-                            match = int(cg.attrib['match'])
-                        break
-                if match > 0:
-                    add_element(book_info, 'genre', g, {'match': str(match)})
-                else:
-                    add_element(book_info, 'genre', g)
+        if md.genres:
+            # The first genre element of a name decides its match value
+            cur_matches: dict[str | None, str | None] = {}
+            for cg in cur_genres:
+                cur_matches.setdefault(cg.text, cg.get('match'))
+
+            for g in md.genres:
+                g = g.casefold().replace(' ', '_')
+                g = _GENRE_REMAP.get(g, g)
+
+                if g in self._ALLOWED_GENRES:
+                    # Keep any current match value
+                    match = int(cur_matches.get(g) or 0)
+                    if match > 0:
+                        self._xml_add_element(book_info, 'genre', g, {'match': str(match)})
+                    else:
+                        self._xml_add_element(book_info, 'genre', g)
 
         if md.description:
-            cur_annos: list[ET.Element] = root.findall('meta-data/book-info/annotation')
+            cur_annos: list[ET.Element] = book_info_index.get('annotation', [])
             found = False
             for anno in cur_annos:
                 # An annotation should have <p> tags
@@ -445,57 +508,50 @@ class ACBF(Tag):
                 element = ET.SubElement(book_info, 'annotation')
                 text_list = md.description.split('\n\n')
                 for t in text_list:
-                    add_element(element, 'p', t)
+                    self._xml_add_element(element, 'p', t)
                 if md.language:
-                    for a in root.findall('meta-data/book-info/annotation'):
+                    for a in cur_annos:
                         if a.get('lang') == md.language:
                             # Remove current annotation with same language attrib
-                            book_info.remove(a)
+                            self._xml_remove_indexed_child(book_info, book_info_index, a)
                             break
                     element.attrib['lang'] = md.language
 
         dbname: str = 'Unknown' if md.data_origin is None else md.data_origin.name
         if md.web_links:
-            for dbref in book_info.findall('databaseref'):
+            for dbref in list(book_info_index.get('databaseref', [])):
                 if dbref.get('type', '').casefold() == 'url':
-                    book_info.remove(dbref)
+                    self._xml_remove_indexed_child(book_info, book_info_index, dbref)
+            # SubElement copies the attribs so the same dict can be used for every link
+            url_attribs = {'type': 'URL', 'dbname': dbname}
             for web in md.web_links:
-                add_element(book_info, 'databaseref', web.url, {'type': 'URL', 'dbname': dbname})
+                self._xml_add_element(book_info, 'databaseref', web.url, url_attribs)
 
         if md.maturity_rating:
             found = False
-            for rate in book_info.findall('content-rating'):
+            for rate in book_info_index.get('content-rating', []):
                 if rate.text == md.maturity_rating:
                     found = True
                     break
             if not found:
-                add_element(book_info, 'content-rating', md.maturity_rating)
+                self._xml_add_element(book_info, 'content-rating', md.maturity_rating)
 
         if md.tags:
-            modify_element('meta-data/book-info/keywords', ', '.join(md.tags))
+            self._xml_modify_element(root, 'meta-data/book-info/keywords', ', '.join(md.tags))
 
         if md.characters:
-            chars = get_or_create_element('meta-data/book-info/characters')
-            chars.clear()
-            for c in md.characters:
-                add_element(chars, 'name', c)
+            self._xml_set_names(book_info, 'characters', md.characters)
 
         if md.teams:
-            teams = get_or_create_element('meta-data/book-info/teams')
-            teams.clear()
-            for team in md.teams:
-                add_element(teams, 'name', team)
+            self._xml_set_names(book_info, 'teams', md.teams)
 
         if md.locations:
-            locs = get_or_create_element('meta-data/book-info/locations')
-            locs.clear()
-            for loc in md.locations:
-                add_element(locs, 'name', loc)
+            self._xml_set_names(book_info, 'locations', md.locations)
 
         if md.issue_id or md.series_id:
             add_issue: bool = True
             add_series: bool = True
-            for dbref in book_info.findall('databaseref'):
+            for dbref in book_info_index.get('databaseref', []):
                 if dbref.get('type', '').casefold() in ['issueid', 'issue_id', 'issue-id']:
                     if md.issue_id is not None and dbref.text == md.issue_id:
                         # Could check 'dbname' too but chances of colliding IDs from different sources seems small
@@ -505,25 +561,27 @@ class ACBF(Tag):
                         if md.series_id is not None and dbref.text == md.series_id:
                             add_series = False
             if md.issue_id and add_issue:
-                add_element(book_info, 'databaseref', md.issue_id, {'type': 'IssueID', 'dbname': dbname})
+                self._xml_add_element(book_info, 'databaseref', md.issue_id, {'type': 'IssueID', 'dbname': dbname})
             if md.series_id and add_series:
-                add_element(book_info, 'databaseref', md.series_id, {'type': 'SeriesID', 'dbname': dbname})
+                self._xml_add_element(book_info, 'databaseref', md.series_id, {'type': 'SeriesID', 'dbname': dbname})
 
         # publisher-info
 
-        get_or_create_element('meta-data/publish-info')
+        self._xml_add_path(root, 'meta-data/publish-info')
 
         if md.identifier:
-            modify_element('meta-data/publish-info/isbn', md.identifier)
+            self._xml_modify_element(root, 'meta-data/publish-info/isbn', md.identifier)
 
         if md.publisher:
             if md.imprint:
-                modify_element('meta-data/publish-info/publisher', md.publisher, {'imprint': md.imprint})
+                self._xml_modify_element(
+                    root, 'meta-data/publish-info/publisher', md.publisher, {'imprint': md.imprint},
+                )
             else:
-                modify_element('meta-data/publish-info/publisher', md.publisher, clear_attribs=True)
+                self._xml_modify_element(root, 'meta-data/publish-info/publisher', md.publisher, clear_attribs=True)
 
         else:
-            clear_element('meta-data/publish-info/publisher')
+            self._xml_clear_element(root, 'meta-data/publish-info/publisher')
 
         if md.year:
             day = md.day or 1
@@ -536,79 +594,86 @@ class ACBF(Tag):
                 year = 1900 + year
 
             pub_date = f'{year:04}-{month:02}-{day:02}'
-            modify_element('meta-data/publish-info/publish-date', pub_date, {'value': pub_date})
+            self._xml_modify_element(root, 'meta-data/publish-info/publish-date', pub_date, {'value': pub_date})
 
         # document-info
 
         if md.notes:
-            history = get_or_create_element('meta-data/document-info/history')
+            history = self._xml_add_path(root, 'meta-data/document-info/history')
             notes_split = md.notes.split('\n')
             history.clear()
             for n in notes_split:
-                add_element(history, 'p', n)
+                self._xml_add_element(history, 'p', n)
 
         if md.scan_info:
-            source = get_or_create_element('meta-data/document-info/source')
-            for s in source:
+            source = self._xml_add_path(root, 'meta-data/document-info/source')
+            # Copy the children as removing while iterating would skip the next one
+            for s in list(source):
                 if s.text and s.text.startswith('[Scan]'):
                     source.remove(s)
 
-            add_element(source, 'p', f'[Scan]{md.scan_info}')
+            self._xml_add_element(source, 'p', f'[Scan]{md.scan_info}')
 
         #  loop and add the page entries under pages node
-        body_node = get_or_create_element('body')
-        # Create a dict for current page data
-        page_dict: dict[str, ET.Element] = {}
-
-        # Cover page is separate for reasons...
-        coverpage = book_info.find('coverpage')
-        if coverpage is not None:
-            image = coverpage.find('image')
-            if image is not None:
-                href = image.get('href')
-                if href is not None:
-                    # Change tag from 'coverpage' to 'page' for ease later
-                    coverpage.tag = 'page'
-                    page_dict[href] = coverpage
-
-            book_info.remove(coverpage)
-
-        for b in body_node:
-            # There should only be page tags but we'll verify
-            if b.tag == 'page':
-                image = b.find('image')
+        body_node = self._xml_add_path(root, 'body')
+        # Leave the current pages alone when the metadata has none
+        if md.pages:
+            # Create a dict for current page data
+            page_dict: dict[str, ET.Element] = {}
+
+            # Cover page is separate for reasons...
+            coverpages = book_info_index.get('coverpage')
+            coverpage = coverpages[0] if coverpages else None
+            if coverpage is not None:
+                image = coverpage.find('image')
                 if image is not None:
                     href = image.get('href')
                     if href is not None:
-                        page_dict[href] = b
-
-        # Save the body attributes so we keep the default background color
-        body_attrib = body_node.attrib.copy()
-        body_node.clear()
-        body_node.attrib = body_attrib
-
-        # pages will be in file name order, not page list order
-        md.pages = sorted(md.pages, key=lambda x: x.display_index)
-
-        for i, page in enumerate(md.pages):
-            old_xml_page = page_dict.get(page.filename)
-            is_cover: bool = False
-            # Cover page lives in book-info, not body
-            if i == 0:
-                is_cover = True
-            if old_xml_page is None:
-                add_page(page, None, is_cover)
-            else:
-                add_page(page, old_xml_page, is_cover)
-
-        ET.indent(root)
+                        page_dict[href] = coverpage
+
+                self._xml_remove_indexed_child(book_info, book_info_index, coverpage)
+                # Change tag from 'coverpage' to 'page' for ease later
+                coverpage.tag = 'page'
+
+            for b in body_node:
+                # There should only be page tags but we'll verify
+                if b.tag == 'page':
+                    image = b.find('image')
+                    if image is not None:
+                        href = image.get('href')
+                        if href is not None:
+                            page_dict[href] = b
+
+            # Save the body attributes so we keep the default background color
+            body_attrib = dict(body_node.attrib)
+            body_node.clear()
+            body_node.attrib.update(body_attrib)
+
+            # pages will be in file name order, not page list order
+            md.pages.sort(key=lambda x: x.display_index)
+
+            for i, page in enumerate(md.pages):
+                old_xml_page = page_dict.get(page.filename)
+                is_cover: bool = False
+                # Cover page lives in book-info, not body
+                if i == 0:
+                    is_cover = True
+                if old_xml_page is None:
+                    self._xml_add_page(book_info, body_node, page, None, is_cover, md.language)
+                else:
+                    self._xml_add_page(book_info, body_node, page, old_xml_page, is_cover, md.language)
 
         return root
 
     def _convert_xml_to_metadata(self, root: ET.Element, file_list: list[str]) -> GenericMetadata:
 
-        def get(name: str) -> str | None:
-            tag = root.find('.//' + name)
+        def find(element: ET.Element | None, name: str) -> ET.Element | None:
+            if element is None:
+                return None
+            return element.find(name)
+
+        def get(element: ET.Element | None, name: str) -> str | None:
+            tag = find(element, name)
             if tag is None:
                 return None
             return tag.text
@@ -627,38 +692,47 @@ class ACBF(Tag):
             return None
 
         def annotation_to_string(ele: ET.Element) -> str | None:
-            anno: list[str] = []
             # annotation - may have lang attrib and *should* have <p> children but will check
-            if len(ele) > 0:
-                for a in ele:
-                    if a.text:
-                        anno.append(a.text)
-            else:
-                if ele.text:
-                    anno.append(ele.text)
-
-            if len(anno) > 0:
-                return '\n\n'.join(anno)
-
-            return None
-
-        # We only allow using the specific versions we know we are compatible with
-        acbf_tags = {f'{{{ns}}}ACBF' for ns in self.namespaces}
-        acbf_tags.add('ACBF')
-
-        if str(root.tag) not in acbf_tags:
+            n = len(ele)
+            if n == 0:
+                return ele.text or None
+            # Single paragraph is the common case
+            if n == 1:
+                return ele[0].text or None
+            return '\n\n'.join(a.text for a in ele if a.text) or None
+
+        def page_info(page: ET.Element) -> tuple[str, str]:
+            # Filename and title in one walk of the page children rather than a path lookup for each
+            filename: str | None = None
+            titles: dict[str, str] = {}
+            for child in page:
+                tag = child.tag
+                if tag == 'title':
+                    if child.text:
+                        titles[child.get('lang', '')] = child.text
+                elif tag == 'image' and filename is None:
+                    filename = child.get('href', '')
+            # Multiple languages, priority is lang attrib: None (missing), en, whatever is found first
+            title = titles.get('') or titles.get('en') or next(iter(titles.values()), '')
+            return filename or '', title
+
+        if not self._is_known_version(root):
             if root.tag.endswith('}ACBF'):
                 raise Exception('Unknown ACBF version: ' + str(root.tag).removesuffix('ACBF').strip('{}'))
             raise Exception('Not an ACBF file')
         self._remove_acbf_xml_namespaces(root)
 
-        md = GenericMetadata()
-
         book_info = root.find('meta-data/book-info')
 
         if book_info is None:
             logger.info('No metadata found in ACBF file')
-            return md
+            return GenericMetadata()
+
+        md = GenericMetadata(is_empty=False)
+
+        # Find each section once and look up fields from there
+        publish_info = root.find('meta-data/publish-info')
+        document_info = root.find('meta-data/document-info')
 
         seq = book_info.findall('sequence')
         if len(seq) > 0:
@@ -692,28 +766,28 @@ class ACBF(Tag):
             elif md.description is None:
                 md.description = annotation_to_string(d)
 
-        publisher = root.find('.//publisher')
+        publisher = find(publish_info, 'publisher')
         if publisher is not None:
             md.publisher = utils.xlate(publisher.text)
             md.imprint = publisher.get('imprint')
 
         # Parse date. The `value` field is ISO but the `text` is anything
-        pub_date = root.find('.//publish-date')
+        pub_date = find(publish_info, 'publish-date')
         if pub_date is not None:
             md.day, md.month, md.year = utils.parse_date_str(pub_date.get('value'))
 
-        if md.year is None and pub_date and pub_date.text:
+        if md.year is None and pub_date is not None and pub_date.text:
             # Try to parse a year to aid tagging
-            match = re.match(r'\d{4}', pub_date.text)
-            md.year = match[0] if match is not None else None
+            match = _YEAR_RE.match(pub_date.text)
+            md.year = int(match[0]) if match is not None else None
 
         langs = book_info.findall('languages')
         if len(langs) > 0:
             md.language = langs[0][0].get('lang')  # Take first for now
 
-        md.maturity_rating = utils.xlate(get('content-rating'))
+        md.maturity_rating = utils.xlate(get(book_info, 'content-rating'))
 
-        md.tags = set(utils.split(get('keywords'), ','))
+        md.tags = set(utils.split(get(book_info, 'keywords'), ','))
 
         for c in book_info.findall('characters/name'):
             md.characters.add(c.text)
@@ -731,7 +805,7 @@ class ACBF(Tag):
                 if dbtype.casefold() == 'url':
                     md.web_links.append(parse_url(dbrefs.text))
 
-        md.identifier = utils.xlate(get('isbn'))
+        md.identifier = utils.xlate(get(publish_info, 'isbn'))
 
         # Now extract the credit info
         for n in book_info.findall('author'):
@@ -762,76 +836,99 @@ class ACBF(Tag):
                 md.add_credit(name, role, False, language)
 
         # history to notes
-        history = root.find('.//history')
-        if history:
-            hist_list: list[str] = []
-            for h in history:
-                if h.text:
-                    hist_list.append(h.text)
-            md.notes = '\n'.join(hist_list)
+        history = find(document_info, 'history')
+        if history is not None and len(history) > 0:
+            md.notes = '\n'.join(h.text for h in history if h.text)
 
         # source (label scan info)
-        source = root.find('.//source')
-        if source:
-            for s in source:
-                if s.text and s.text.startswith('[Scan]'):
-                    md.scan_info = s.text[6:]
+        source = find(document_info, 'source')
+        if source is not None and len(source) > 0:
+            # The last [Scan] entry is the newest, older writers could leave stale ones ahead of it
+            for s in reversed(source):
+                txt = s.text
+                if txt is not None and txt[:6] == '[Scan]':
+                    md.scan_info = txt[6:]
+                    break
 
         # parse page data now
-        pages_node = root.findall('body/page')
+        pages_node: Iterable[ET.Element] = root.iterfind('body/page')
 
-        page_file_list: dict[str, int] = {}
-        for i, f in enumerate(file_list):
-            page_file_list[f] = i
+        # Without a file list every page falls back to its display index
+        page_file_list: dict[str, int] = {f: i for i, f in enumerate(file_list)} if file_list else {}
 
         # Cover page is separate for reasons...
         coverpage = book_info.find('coverpage')
         if coverpage is not None:
-            pages_node.insert(0, coverpage)
-
-        for i, page in enumerate(pages_node):
-            image = page.find('image')
-            titles = page.findall('title')
-            title = ''
-            for t in titles:
-                lang = t.get('lang', '')
-                # Multiple languages, priority is lang attrib: None (missing), en, whatever is found
-                if lang == '' and t.text:
-                    title = t.text
-                    break
-                elif lang == 'en' and t.text:
-                    title = t.text
-                elif title == '' and t.text:
-                    title = t.text
-
-            filename = image.get('href', '') if image is not None else ''
-            # Matching the archive_index here _is_ necessary as _currently_ it's what links the page to the rest of the data.
-            # It should change to be archive_index or filename in the future
-            archive_index = page_file_list.get(filename)
-            if archive_index is None:
-                archive_index = i
-
-            md_page = PageMetadata(
+            pages_node = itertools.chain((coverpage,), pages_node)
+
+        # Matching the archive_index here _is_ necessary as _currently_ it's what links the page to the rest of the data.
+        # It should change to be archive_index or filename in the future
+        md.pages = [
+            PageMetadata(
                 filename=filename,
                 display_index=i,
-                archive_index=archive_index,
+                archive_index=page_file_list.get(filename, i),
                 bookmark=title,
                 type='',
             )
-
-            md.pages.append(md_page)
-
-        md.is_empty = False
+            for i, (filename, title) in enumerate(map(page_info, pages_node))
+        ]
 
         return md
 
     def _validate_bytes(self, string: bytes) -> bool:
         """Verify that the string actually contains ACBF data in XML format."""
+        # Only the root element is checked so feed small chunks and stop at the first start event
+        parser = _pull_parser(('start',))
         try:
-            root = ET.fromstring(string)
-            if not root.tag.endswith('ACBF'):
-                return False
+            for _, root in _feed(parser, string, 4096):
+                return root.tag.endswith('ACBF')
         except ET.ParseError:
             return False
 
-        return True
+        return False
+
+    def _is_known_version(self, root: ET.Element) -> bool:
+        # We only allow using the specific versions we know we are compatible with
+        acbf_tags = {f'{{{ns}}}ACBF' for ns in self.namespaces}
+        acbf_tags.add('ACBF')
+        return str(root.tag) in acbf_tags
+
+    def _parse_acbf(self, string: bytes, drop_unread: bool = False) -> ET.Element | None:
+        """Parse the string, checking it is ACBF as soon as the root element starts. Returns None if it is not.
+
+        With drop_unread embedded images, which metadata is never read from, are cleared as soon as each is parsed.
+        """
+        if drop_unread:
+            parser = _pull_parser(('start', 'end'), ('{*}ACBF', f'{{*}}{_UNREAD_TAG}'))
+        else:
+            parser = _pull_parser(('start',), ('{*}ACBF',))
+        events = _feed(parser, string, 65536)
+        try:
+            _, root = next(events)
+            # lxml only reports the filtered tags so also check it is the document root
+            if not root.tag.endswith('ACBF') or (_LXML and root.getparent() is not None):
+                return None
+            # Keep going to build the rest of the tree
+            for event, ele in events:
+                if event == 'end' and ele.tag.rpartition('}')[2] == _UNREAD_TAG:
+                    ele.clear()
+            # Closing fails when the document was not complete
+            parser.close()
+        except (ET.ParseError, StopIteration):
+            return None
+
+        return root
+
+
+def metadata_from_bytes(data: bytes) -> GenericMetadata:
+    """Read the metadata from the bytes of an ACBF file outside of an archive.
+
+    Holds no state between calls so it can be mapped over many files with a thread or process pool. Empty metadata
+    is returned when the bytes are not ACBF or are an ACBF version that isn't supported, rather than raising.
+    """
+    acbf = ACBF('')
+    root = acbf._parse_acbf(data, drop_unread=True)
+    if root is not None and acbf._is_known_version(root):
+        return acbf._convert_xml_to_metadata(root, [])
+    return GenericMetadata()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import pytest
+from comicapi.genericmetadata import GenericMetadata
+
+from acbfxml import ACBF
+from acbfxml import metadata_from_bytes
+
+
+class MemoryArchive:
+    """Just enough of an Archiver to read and write files held in a dict."""
+
+    def __init__(self, files: dict[str, bytes]) -> None:
+        self.files = dict(files)
+
+    def name(self) -> str:
+        return 'Memory'
+
+    def supports_files(self) -> bool:
+        return True
+
+    def get_filename_list(self) -> list[str]:
+        return list(self.files)
+
+    def read_file(self, archive_file: str) -> bytes:
+        return self.files[archive_file]
+
+    def write_file(self, archive_file: str, data: bytes) -> bool:
+        self.files[archive_file] = data
+        return True
+
+    def remove_file(self, archive_file: str) -> bool:
+        del self.files[archive_file]
+        return True
+
+
+ACBF_XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<ACBF xmlns="http://www.acbf.info/xml/acbf/1.1">
+  <meta-data>
+    <book-info>
+      <book-title>Title</book-title>
+    </book-info>
+    <publish-info>
+      <publisher>Publisher</publisher>
+      {publish_date}
+    </publish-info>
+  </meta-data>
+  <body/>
+</ACBF>
+'''
+
+
+@pytest.mark.parametrize(
+    'publish_date, year',
+    [
+        ('<publish-date value="2001-02-03">3 February 2001</publish-date>', 2001),
+        # No value attribute, the year is taken from the text
+        ('<publish-date>2001</publish-date>', 2001),
+    ],
+)
+def test_publish_date_year_round_trip(publish_date: str, year: int) -> None:
+    acbf = ACBF('1')
+    xml = ACBF_XML.format(publish_date=publish_date).encode()
+
+    # The same parse and conversion read_tags and write_tags use
+    root = acbf._parse_acbf(xml, drop_unread=True)
+    assert root is not None
+    md = acbf._convert_xml_to_metadata(root, [])
+    assert md.year == year
+
+    written = acbf._bytes_from_xml(acbf._convert_metadata_to_xml(md, acbf._parse_acbf(xml)))
+    root = acbf._parse_acbf(written, drop_unread=True)
+    assert root is not None
+    assert acbf._convert_xml_to_metadata(root, []).year == year
+
+
+def test_large_binary_read_and_write() -> None:
+    # libxml2 refuses text nodes over 10MB unless huge_tree is on
+    cover = b'A' * 11_000_000
+    xml = ACBF_XML.format(publish_date='').encode().replace(
+        b'<body/>', b'<body/><data><binary id="cover.jpg" content-type="image/jpeg">' + cover + b'</binary></data>',
+    )
+    archive = MemoryArchive({'comic.acbf': xml})
+    acbf = ACBF('1')
+
+    md = acbf.read_tags(archive)
+    assert md.series == 'Title'
+
+    md.series = 'Series'
+    assert acbf.write_tags(md, archive)
+    assert cover in archive.files['comic.acbf']
+    assert acbf.read_tags(archive).series == 'Series'
+
+
+def test_write_without_pages_keeps_current_pages() -> None:
+    xml = ACBF_XML.format(publish_date='').encode().replace(
+        b'</book-title>', b'</book-title><coverpage><image href="p00.jpg"/></coverpage>',
+    ).replace(
+        b'<body/>', b'<body><page><image href="p01.jpg"/></page><page><image href="p02.jpg"/></page></body>',
+    )
+    archive = MemoryArchive({'comic.acbf': xml})
+    acbf = ACBF('1')
+
+    md = acbf.read_tags(archive)
+    assert [p.filename for p in md.pages] == ['p00.jpg', 'p01.jpg', 'p02.jpg']
+
+    md.pages = []
+    assert acbf.write_tags(md, archive)
+    assert [p.filename for p in acbf.read_tags(archive).pages] == ['p00.jpg', 'p01.jpg', 'p02.jpg']
+    assert b'<coverpage>' in archive.files['comic.acbf']
+
+
+def test_internal_entities_round_trip() -> None:
+    xml = ACBF_XML.format(publish_date='').encode().replace(
+        b'<ACBF ', b'<!DOCTYPE ACBF [<!ENTITY e "ENT">]>\n<ACBF ',
+    ).replace(b'<book-title>Title</book-title>', b'<book-title>x&e;y</book-title>')
+    archive = MemoryArchive({'comic.acbf': xml})
+    acbf = ACBF('1')
+
+    md = acbf.read_tags(archive)
+    assert md.series == 'xENTy'
+
+    assert acbf.write_tags(md, archive)
+    assert acbf.read_tags(archive).series == 'xENTy'
+
+
+def test_write_keeps_unparseable_acbf() -> None:
+    # The root is ACBF so it validates, but the file is cut short
+    xml = ACBF_XML.format(publish_date='').encode().replace(
+        b'<body/>', b'<body/><data><binary id="cover.jpg">' + b'A' * 10_000 + b'</binary></data>',
+    )[:-20]
+    archive = MemoryArchive({'comic.acbf': xml})
+    acbf = ACBF('1')
+    assert acbf.has_tags(archive)
+
+    assert not acbf.write_tags(acbf.read_tags(archive), archive)
+    assert archive.files['comic.acbf'] == xml
+
+
+def test_write_replaces_non_acbf() -> None:
+    archive = MemoryArchive({'comic.acbf': b'<foo/>'})
+    acbf = ACBF('1')
+
+    md = GenericMetadata()
+    md.series = 'Series'
+    assert acbf.write_tags(md, archive)
+    assert acbf.read_tags(archive).series == 'Series'
+
+
+def test_scan_info_replaces_stale_entries() -> None:
+    # Older writers could leave stale [Scan] entries ahead of the newest one
+    xml = ACBF_XML.format(publish_date='').encode().replace(
+        b'</meta-data>',
+        b'<document-info><source><p>[Scan]old</p><p>Original</p><p>[Scan]older</p><p>[Scan]newest</p></source>'
+        b'</document-info></meta-data>',
+    )
+    archive = MemoryArchive({'comic.acbf': xml})
+    acbf = ACBF('1')
+
+    md = acbf.read_tags(archive)
+    assert md.scan_info == 'newest'
+
+    md.scan_info = 'rescan'
+    assert acbf.write_tags(md, archive)
+    written = archive.files['comic.acbf']
+    assert written.count(b'[Scan]') == 1
+    assert b'Original' in written
+    assert acbf.read_tags(archive).scan_info == 'rescan'
+
+
+@pytest.mark.parametrize(
+    'data, series',
+    [
+        (ACBF_XML.format(publish_date='').encode(), 'Title'),
+        (b'<foo><book-title>Title</book-title></foo>', None),
+        (b'<ACBF><meta-data>', None),
+        (b'not xml', None),
+        (ACBF_XML.format(publish_date='').encode().replace(b'acbf/1.1', b'acbf/9.9'), None),
+    ],
+    ids=['valid', 'not acbf', 'malformed', 'not xml', 'unknown version'],
+)
+def test_metadata_from_bytes(data: bytes, series: str | None) -> None:
+    md = metadata_from_bytes(data)
+    assert md.series == series
+    assert md.is_empty == (series is None)